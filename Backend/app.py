@@ -1,14 +1,15 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, g
 from flask_cors import CORS
 import uuid
 import os
-import requests
+import cProfile
+import random
+import socket
+import threading
+import time
 import json
 import re
 from typing import Dict, List, Optional
-from langchain_groq import ChatGroq
-from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
-from langchain_core.prompts import ChatPromptTemplate
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -25,6 +26,37 @@ if groq_api_key:
 else:
     print("Warning: GROQ_API_KEY not found in .env file")
 
+# langchain_groq and requests are imported on first use, and the shared LLM client
+# is pre-warmed in the background once the port is bound, to keep cold start fast.
+llm_client = None
+llm_lock = threading.Lock()
+
+def get_llm():
+    global llm_client
+    if llm_client is None:
+        with llm_lock:
+            if llm_client is None:
+                from langchain_groq import ChatGroq
+                llm_client = ChatGroq(
+                    model="llama-3.3-70b-versatile",
+                    temperature=0.2,
+                    max_tokens=2048
+                )
+    return llm_client
+
+def prewarm_llm(port: int, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1):
+                break
+        except OSError:
+            time.sleep(0.1)
+    try:
+        get_llm()
+    except Exception as e:
+        print(f"LLM pre-warm failed: {e}")
+
 class UserProfile:
     def __init__(self):
         self.monthly_income: Optional[int] = None
@@ -46,16 +78,13 @@ class UserProfile:
             "monthly_income": self.monthly_income,
             "spending_habits": self.spending_categories,
             "preferred_benefits": self.preferred_benefits,
-            "annual_fee_preference": self.annual_fee_preference
+            "annual_fee_preference": self.annual_fee_preference,
+            "additional_context": self.additional_context.strip()
         }
 
 class ConversationalCreditCardAssistant:
-    def __init__(self):
-        self.llm = ChatGroq(
-            model="llama-3.3-70b-versatile",
-            temperature=0.2,
-            max_tokens=2048
-        )
+    def __init__(self, session_id: Optional[str] = None):
+        self.session_id = session_id
         self.user_profile = UserProfile()
         self.conversation_history = []
         self.api_url = "http://localhost:8002/recommendations"
@@ -64,6 +93,10 @@ class ConversationalCreditCardAssistant:
         self.benefit_types = ["cashback", "rewards", "lounge", "travel", "fuel", "dining", "shopping", "entertainment"]
         self.fee_preferences = ["no fee", "low fee", "any"]
 
+    @property
+    def llm(self):
+        return get_llm()
+
     def safe_int_conversion(self, value, default=0):
         try:
             if isinstance(value, str):
@@ -106,6 +139,7 @@ Examples:
 """
 
         try:
+            from langchain_core.messages import HumanMessage, SystemMessage
             response = self.llm.invoke([
                 SystemMessage(content=system_prompt),
                 HumanMessage(content=user_message)
@@ -175,6 +209,7 @@ Generate a conversational response that:
 Don't ask for all missing info at once. Focus on the most critical piece."""
 
         try:
+            from langchain_core.messages import HumanMessage, SystemMessage
             response = self.llm.invoke([
                 SystemMessage(content=system_prompt),
                 HumanMessage(content="Generate appropriate follow-up question")
@@ -184,10 +219,12 @@ Don't ask for all missing info at once. Focus on the most critical piece."""
             return f"I'd love to help you find the perfect card! Could you tell me about your {missing_info[0]}?"
 
     def get_recommendations(self) -> str:
+        import requests
+
         try:
             response = requests.post(
                 self.api_url,
-                json=self.user_profile.to_dict(),
+                json={**self.user_profile.to_dict(), "session_id": self.session_id},
                 headers={"Content-Type": "application/json"},
                 timeout=15
             )
@@ -330,11 +367,61 @@ What brings you here today? Tell me about your spending habits or what you're lo
 
         return greeting
 
+# Opt-in request profiling. With PROFILING set, before_request starts cProfile for
+# sampled requests (PROFILE_SAMPLE_RATE, or the PROFILE_HEADER header set) and
+# teardown_request stops it. The profile covers the whole view in the request's
+# thread: the LLM calls and the wait on the Server, not the Server's scoring,
+# which the Server profiles itself. Unless PROFILING is set no hooks are
+# registered. Files are pstats dumps in PROFILE_DIR; only the newest
+# PROFILE_MAX_FILES (at least 1) are kept.
+PROFILING = os.environ.get('PROFILING', '').lower() in ('1', 'true', 'yes')
+PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', 0.01))
+PROFILE_HEADER = os.environ.get('PROFILE_HEADER', 'X-Profile')
+PROFILE_DIR = os.environ.get('PROFILE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'profiles'))
+PROFILE_MAX_FILES = max(int(os.environ.get('PROFILE_MAX_FILES', 100)), 1)
+# cProfile allows one active profiler at a time; overlapping requests go unprofiled
+profile_lock = threading.Lock()
+
+def should_profile(headers) -> bool:
+    return headers.get(PROFILE_HEADER, '').lower() in ('1', 'true', 'yes') or random.random() < PROFILE_SAMPLE_RATE
+
+def save_profile(profiler: cProfile.Profile, route: str, session_id: Optional[str]):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    tag = re.sub(r'[^A-Za-z0-9_-]+', '-', f"{route}_{session_id or 'nosession'}").strip('-')
+    profiler.dump_stats(os.path.join(PROFILE_DIR, f"{time.time_ns()}_{tag}.prof"))
+
+    profiles = sorted(name for name in os.listdir(PROFILE_DIR) if name.endswith('.prof'))
+    for name in profiles[:max(len(profiles) - PROFILE_MAX_FILES, 0)]:
+        try:
+            os.remove(os.path.join(PROFILE_DIR, name))
+        except FileNotFoundError:
+            pass
+
+if PROFILING:
+    @app.before_request
+    def start_profiling():
+        if should_profile(request.headers) and profile_lock.acquire(blocking=False):
+            g.profiler = cProfile.Profile()
+            g.profiler.enable()
+
+    @app.teardown_request
+    def stop_profiling(exc):
+        profiler = g.pop('profiler', None)
+        if profiler is None:
+            return
+        try:
+            profiler.disable()
+            data = request.get_json(silent=True)
+            session_id = data.get('session_id') if isinstance(data, dict) else None
+            save_profile(profiler, request.path, session_id)
+        finally:
+            profile_lock.release()
+
 # Flask API Routes
 @app.route('/start', methods=['POST'])
 def start_conversation():
     session_id = str(uuid.uuid4())
-    assistant = ConversationalCreditCardAssistant()
+    assistant = ConversationalCreditCardAssistant(session_id)
     sessions[session_id] = assistant
     
     return jsonify({
@@ -366,7 +453,7 @@ def restart():
     data = request.json
     session_id = data.get('session_id')
     
-    assistant = ConversationalCreditCardAssistant()
+    assistant = ConversationalCreditCardAssistant(session_id)
     sessions[session_id] = assistant
     
     return jsonify({
@@ -384,4 +471,5 @@ def test():
 
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
+    threading.Thread(target=prewarm_llm, args=(port,), daemon=True).start()
     app.run(host='0.0.0.0', port=port, debug=False)
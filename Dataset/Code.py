@@ -1,4 +1,6 @@
 import json
+import os
+import re
 
 # Credit cards dataset
 credit_cards_data = {
@@ -294,14 +296,195 @@ credit_cards_data = {
   ]
 }
 
-# Save as JSON file
-with open('credit_cards_dataset.json', 'w', encoding='utf-8') as f:
-    json.dump(credit_cards_data, f, indent=2, ensure_ascii=False)
 
-print("Dataset saved as 'credit_cards_dataset.json'")
+# Compiler: turns the free-text catalog into numeric, pre-parsed fields that the
+# Server loads directly, so no text parsing happens on the request path.
 
-# Load the dataset to verify
-with open('credit_cards_dataset.json', 'r', encoding='utf-8') as f:
-    loaded_data = json.load(f)
+OUTPUT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'credit_cards_dataset.json')
 
-print(f"Total cards in dataset: {len(loaded_data['cards'])}")
\ No newline at end of file
+# Rupee value of one reward point, used to put points cards on the same
+# "% of spend returned" scale as cashback cards.
+POINT_VALUE = 0.25
+
+REQUIRED_FIELDS = {
+    "name": str,
+    "issuer": str,
+    "joining_fee": int,
+    "annual_fee": int,
+    "eligibility": str,
+    "reward_type": str,
+    "reward_rate": str,
+    "perks": list
+}
+
+# Canonical spending categories (same names the Backend extracts) and the
+# keywords that map reward-rate text onto them.
+CATEGORY_KEYWORDS = {
+    "fuel": ["fuel", "petrol", "gas"],
+    "groceries": ["grocery", "groceries", "supermarket", "departmental"],
+    "dining": ["dining", "restaurant", "food", "swiggy", "zomato"],
+    "online": ["online", "e-commerce", "amazon", "flipkart", "myntra"],
+    "offline": ["offline", "retail"],
+    "travel": ["travel", "flight", "hotel", "ola", "uber"],
+    "shopping": ["shopping", "amazon", "flipkart", "myntra", "departmental"],
+    "utilities": ["utility", "utilities", "bill"],
+    "entertainment": ["entertainment", "movie", "movies"]
+}
+
+# Canonical perk tags and the keywords matched against perks and reward_type.
+PERK_TAG_KEYWORDS = {
+    "cashback": ["cashback", "cash back"],
+    "rewards": ["reward", "points"],
+    "lounge": ["lounge"],
+    "travel": ["travel", "insurance"],
+    "fuel": ["fuel", "surcharge"],
+    "dining": ["dining"],
+    "shopping": ["amazon", "flipkart", "shopping", "voucher"],
+    "entertainment": ["movie", "bookmyshow", "entertainment"],
+    "golf": ["golf"],
+    "concierge": ["concierge"],
+    "lifetime free": ["lifetime free", "no annual fee"]
+}
+
+DEFAULT_CATEGORY = "default"
+
+# Multipliers for amounts written with Indian units, e.g. "₹8 lakh".
+INCOME_UNITS = {"lakh": 100000, "lac": 100000, "crore": 10000000, "cr": 10000000, "k": 1000}
+
+
+def parse_min_monthly_income(eligibility: str) -> int:
+    # the amount must follow "monthly/annual income"; other numbers (age, tenure) are ignored
+    text = eligibility.lower()
+    period = re.search(r'\b(monthly|annual|yearly)\s+income\b', text)
+    if not period:
+        if re.search(r'\bincome\b', text) and re.search(r'(?:₹|\brs\.?|\binr)\s*\d', text):
+            raise ValueError(f"income amount without a monthly or annual period in eligibility '{eligibility}'")
+        if re.search(r'\b(minimum|min\.?)\s+income\b', text):
+            raise ValueError(f"no income amount in eligibility '{eligibility}'")
+        return 0
+
+    amount = re.match(
+        r'\s*(?:of|above|over|at least|:|-)?\s*(?:₹|rs\.?|inr)?\s*(\d[\d,]*(?:\.\d+)?)\s*(lakhs?|lacs?|crores?|cr|k)?\b',
+        text[period.end():]
+    )
+    if not amount:
+        raise ValueError(f"no income amount in eligibility '{eligibility}'")
+
+    value = float(amount.group(1).replace(',', '')) * INCOME_UNITS.get((amount.group(2) or '').rstrip('s'), 1)
+    if period.group(1) != 'monthly':
+        value /= 12
+    return int(value)
+
+
+def parse_reward_rates(reward_rate: str) -> dict:
+    clauses = [c.strip() for c in reward_rate.lower().split(';') if c.strip()]
+    points_pattern = r'(\d+(?:\.\d+)?)\s*(?:edge\s+)?points?\s+per\s+₹\s*([\d,]+)'
+
+    # 1X is the card's base points rate; without one stated, assume 1 point per ₹100.
+    base_points_pct = 1 / 100 * POINT_VALUE * 100
+    for clause in clauses:
+        match = re.search(points_pattern, clause)
+        if match and ('all spends' in clause or 'elsewhere' in clause):
+            base_points_pct = float(match.group(1)) / int(match.group(2).replace(',', '')) * POINT_VALUE * 100
+            break
+
+    rates = {}
+    clause_rates = []
+    for clause in clauses:
+        points = re.search(points_pattern, clause)
+        percent = re.search(r'(\d+(?:\.\d+)?)\s*%', clause)
+        multiplier = re.search(r'(\d+(?:\.\d+)?)x\b', clause)
+
+        if points:
+            rate = float(points.group(1)) / int(points.group(2).replace(',', '')) * POINT_VALUE * 100
+        elif percent:
+            rate = float(percent.group(1))
+        elif multiplier:
+            rate = float(multiplier.group(1)) * base_points_pct
+        else:
+            continue
+        rate = round(rate, 4)
+        clause_rates.append(rate)
+
+        if 'elsewhere' in clause or 'all spends' in clause:
+            rates[DEFAULT_CATEGORY] = max(rates.get(DEFAULT_CATEGORY, 0.0), rate)
+            continue
+
+        for category, keywords in CATEGORY_KEYWORDS.items():
+            if any(re.search(r'\b' + re.escape(k) + r'\b', clause) for k in keywords):
+                rates[category] = max(rates.get(category, 0.0), rate)
+
+    if not clause_rates:
+        raise ValueError(f"no reward rate found in '{reward_rate}'")
+    if DEFAULT_CATEGORY not in rates:
+        rates[DEFAULT_CATEGORY] = min(clause_rates)
+
+    return rates
+
+
+def parse_perk_tags(perks: list, reward_type: str) -> list:
+    text = ' '.join([perk.lower() for perk in perks] + [reward_type.lower()])
+    return [tag for tag, keywords in PERK_TAG_KEYWORDS.items() if any(k in text for k in keywords)]
+
+
+def validate_card(card: dict, index: int):
+    if not isinstance(card, dict):
+        raise ValueError(f"Card #{index}: expected an object, got {type(card).__name__}")
+
+    label = card.get('name', f"#{index}")
+    for field, field_type in REQUIRED_FIELDS.items():
+        if field not in card:
+            raise ValueError(f"Card {label}: missing required field '{field}'")
+        if not isinstance(card[field], field_type) or isinstance(card[field], bool):
+            raise ValueError(f"Card {label}: field '{field}' must be {field_type.__name__}")
+
+    if card['annual_fee'] < 0 or card['joining_fee'] < 0:
+        raise ValueError(f"Card {label}: fees must be non-negative")
+    if not all(isinstance(perk, str) for perk in card['perks']):
+        raise ValueError(f"Card {label}: perks must be a list of strings")
+
+
+def compile_card(card: dict, index: int) -> dict:
+    validate_card(card, index)
+
+    compiled = dict(card)
+    try:
+        compiled['min_monthly_income'] = parse_min_monthly_income(card['eligibility'])
+        compiled['reward_rates'] = parse_reward_rates(card['reward_rate'])
+    except ValueError as e:
+        raise ValueError(f"Card {card['name']}: {e}") from None
+    compiled['perk_tags'] = parse_perk_tags(card['perks'], card['reward_type'])
+    return compiled
+
+
+def compile_catalog(data: dict) -> dict:
+    cards = data.get('cards') if isinstance(data, dict) else None
+    if not isinstance(cards, list):
+        raise ValueError("Catalog must be an object with a 'cards' list")
+
+    names = set()
+    compiled_cards = []
+    for index, card in enumerate(cards):
+        compiled = compile_card(card, index)
+        if compiled['name'] in names:
+            raise ValueError(f"Card {compiled['name']}: duplicate name")
+        names.add(compiled['name'])
+        compiled_cards.append(compiled)
+
+    return {"cards": compiled_cards}
+
+
+if __name__ == "__main__":
+    compiled_data = compile_catalog(credit_cards_data)
+
+    # Save as JSON file
+    with open(OUTPUT_PATH, 'w', encoding='utf-8') as f:
+        json.dump(compiled_data, f, indent=2, ensure_ascii=False)
+
+    print("Dataset saved as 'credit_cards_dataset.json'")
+
+    # Load the dataset to verify
+    with open(OUTPUT_PATH, 'r', encoding='utf-8') as f:
+        loaded_data = json.load(f)
+
+    print(f"Total cards in dataset: {len(loaded_data['cards'])}")
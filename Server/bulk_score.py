@@ -0,0 +1,178 @@
+import argparse
+import csv
+import heapq
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Dict, Iterator, List
+
+import orjson
+from fastapi import HTTPException
+from pydantic import ValidationError
+
+from main import CARD_TEXT_MATRIX, cards_data, validate_scoring_mode
+from scoring import TOP_K, UserInput, calculate_match_score, match_text, rank_by_value, recommendation_details, text_vectors
+
+LIST_FIELDS = ('spending_habits', 'preferred_benefits')
+# readers put undecodable records under this key so they become error lines instead of stopping the run
+DECODE_ERROR = '_decode_error'
+
+def read_jsonl(path: str) -> Iterator[Dict]:
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield {DECODE_ERROR: f"{path}:{line_number}: invalid JSON: {e}"}
+                continue
+            if not isinstance(record, dict):
+                record = {DECODE_ERROR: f"{path}:{line_number}: expected a JSON object"}
+            yield record
+
+def read_csv(path: str) -> Iterator[Dict]:
+    # list columns hold values separated by ';' or '|', e.g. "dining;travel"
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            if None in row:
+                # DictReader puts fields beyond the header under the key None
+                yield {'id': row.get('id') or None, DECODE_ERROR: f"{path}:{reader.line_num}: {len(row[None])} more fields than the header"}
+                continue
+            record = {key: value for key, value in row.items() if value not in (None, '')}
+            for field in LIST_FIELDS:
+                raw = record.get(field, '')
+                record[field] = [item.strip() for item in raw.replace('|', ';').split(';') if item.strip()]
+            if 'monthly_spend' in record:
+                try:
+                    record['monthly_spend'] = json.loads(record['monthly_spend'])
+                except json.JSONDecodeError as e:
+                    record = {'id': record.get('id'), DECODE_ERROR: f"{path}:{reader.line_num}: invalid monthly_spend JSON: {e}"}
+            yield record
+
+def read_profiles(paths: List[str], input_format: str) -> Iterator[Dict]:
+    for path in paths:
+        file_format = input_format or ('csv' if path.lower().endswith('.csv') else 'jsonl')
+        yield from (read_csv(path) if file_format == 'csv' else read_jsonl(path))
+
+def chunked(records: Iterator[Dict], size: int) -> Iterator[List[Dict]]:
+    while True:
+        chunk = list(islice(records, size))
+        if not chunk:
+            return
+        yield chunk
+
+def score_value_users(users: List[tuple], k: int) -> Dict[int, List[Dict]]:
+    # value-mode profiles share one spend x reward-rate product, as in /recommendations/batch
+    rankings, values = rank_by_value([user for _, user in users], k)
+    recommendations = {}
+    for position, (row, user) in enumerate(users):
+        text_scores = match_text(user, rankings[position])
+        recommendations[row] = [
+            {"card_name": cards_data[i].get('name', 'Unknown Card'), **recommendation_details(cards_data[i], user, float(values[position, i]), text_scores[j])}
+            for j, i in enumerate(rankings[position])
+        ]
+    return recommendations
+
+def score_chunk(records: List[Dict], k: int) -> bytes:
+    lines = [None] * len(records)
+    match_users, value_users = [], []
+    for row, record in enumerate(records):
+        if DECODE_ERROR in record:
+            lines[row] = orjson.dumps({"id": record.get('id'), "error": record[DECODE_ERROR]})
+            continue
+        try:
+            user = UserInput(**{key: value for key, value in record.items() if key != 'id'})
+            validate_scoring_mode(user)
+        except (ValidationError, TypeError, ValueError) as e:
+            lines[row] = orjson.dumps({"id": record.get('id'), "error": str(e)})
+            continue
+        except HTTPException as e:
+            lines[row] = orjson.dumps({"id": record.get('id'), "error": e.detail})
+            continue
+        (value_users if user.scoring_mode == "value" else match_users).append((row, user))
+
+    recommendations = score_value_users(value_users, k) if value_users else {}
+
+    # one sparse product for the whole chunk: benefits and context of every user as query columns.
+    # It stays sparse (CSC, so column slices are cheap); only one profile's columns are made dense at a time.
+    queries, offsets = [], []
+    for _, user in match_users:
+        offsets.append(len(queries))
+        queries.extend(list(user.preferred_benefits) + [user.additional_context or ''])
+    similarities = (CARD_TEXT_MATRIX @ text_vectors(queries).T).tocsc() if match_users else None
+
+    for (row, user), offset in zip(match_users, offsets):
+        text_scores = similarities[:, offset:offset + len(user.preferred_benefits) + 1].toarray()
+        scored = (
+            (calculate_match_score(card, user, text_scores[i])[0], -i)
+            for i, card in enumerate(cards_data)
+        )
+        indices = [-neg_index for _, neg_index in heapq.nlargest(k, scored)]
+        recommendations[row] = [
+            {"card_name": cards_data[i].get('name', 'Unknown Card'), **recommendation_details(cards_data[i], user, text_scores=text_scores[i])}
+            for i in indices
+        ]
+
+    for row, recommendation in recommendations.items():
+        lines[row] = orjson.dumps({"id": records[row].get('id'), "recommendations": recommendation})
+    return b'\n'.join(lines) + b'\n'
+
+def positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+def run(args):
+    chunks = chunked(read_profiles(args.inputs, args.format), args.chunk_size)
+    pool = ProcessPoolExecutor(max_workers=args.workers) if args.workers > 1 else None
+    # bounded queue of in-flight chunks keeps memory constant and output in input order
+    pending = deque()
+    scored = 0
+    started = time.perf_counter()
+    last_report = started
+
+    def write_oldest(out):
+        nonlocal scored, last_report
+        count, result = pending.popleft()
+        out.write(result.result() if pool else result)
+        scored += count
+        now = time.perf_counter()
+        if now - last_report >= args.progress_interval:
+            print(f"Scored {scored:,} profiles ({scored / (now - started):,.0f} profiles/s)", file=sys.stderr)
+            last_report = now
+
+    with open(args.output, 'wb') as out:
+        try:
+            for chunk in chunks:
+                if pool:
+                    pending.append((len(chunk), pool.submit(score_chunk, chunk, args.top_k)))
+                else:
+                    pending.append((len(chunk), score_chunk(chunk, args.top_k)))
+                if len(pending) >= max(args.workers, 1) * 2:
+                    write_oldest(out)
+            while pending:
+                write_oldest(out)
+        finally:
+            if pool:
+                pool.shutdown(cancel_futures=True)
+
+    elapsed = time.perf_counter() - started
+    print(f"Done: {scored:,} profiles in {elapsed:.1f}s ({scored / max(elapsed, 1e-9):,.0f} profiles/s) against {len(cards_data)} cards", file=sys.stderr)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score user profiles from JSONL/CSV files against the card catalog and write top-k recommendations as JSONL.")
+    parser.add_argument('inputs', nargs='+', help="JSONL or CSV files of user profiles (UserInput fields plus an optional id)")
+    parser.add_argument('-o', '--output', required=True, help="JSONL file to write one result per profile to")
+    parser.add_argument('--format', choices=['jsonl', 'csv'], help="input format; inferred from the file extension by default")
+    parser.add_argument('-k', '--top-k', type=positive_int, default=TOP_K)
+    parser.add_argument('-w', '--workers', type=positive_int, default=os.cpu_count() or 1)
+    parser.add_argument('--chunk-size', type=positive_int, default=1000)
+    parser.add_argument('--progress-interval', type=float, default=5.0, help="seconds between progress reports on stderr")
+    run(parser.parse_args())
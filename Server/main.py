@@ -1,13 +1,36 @@
+import asyncio
+import bisect
+import gzip
+import hashlib
+import heapq
 import json
-import uvicorn
-from fastapi import FastAPI, HTTPException
+import os
+import threading
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+import multiprocessing
+import numpy as np
+import orjson
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 from pydantic import BaseModel
 from typing import List, Dict, Optional
-import pandas as pd
+import scoring
+from profiling import PROFILING, run_profiled, should_profile
+from scoring import (
+    BENEFIT_MATCH_THRESHOLD, CONTEXT_WEIGHT, TOP_K, UserInput, match_text, recommendation_details,
+    score_shard, text_vectors, value_details
+)
 
 app = FastAPI(title="Credit Card Recommendation API")
 
-with open('../Dataset/credit_cards_dataset.json', 'r') as f:
+DATASET_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Dataset', 'credit_cards_dataset.json')
+
+# Fields produced by Dataset/Code.py; the Server never parses catalog text itself.
+COMPILED_FIELDS = ('min_monthly_income', 'reward_rates', 'perk_tags')
+
+with open(DATASET_PATH, 'r', encoding='utf-8') as f:
     raw_data = json.load(f)
 
     if isinstance(raw_data, dict) and 'cards' in raw_data:
@@ -17,15 +40,89 @@ with open('../Dataset/credit_cards_dataset.json', 'r') as f:
     else:
         cards_data = []
 
+    for card in cards_data:
+        missing = [field for field in COMPILED_FIELDS if field not in card]
+        if missing:
+            raise RuntimeError(f"Card {card.get('name', 'Unknown Card')} is missing compiled fields {missing}; run Dataset/Code.py to rebuild the dataset")
+
     print(f"Loaded {len(cards_data)} cards")
     if cards_data:
         print(f"Sample card keys: {list(cards_data[0].keys())}")
 
-class UserInput(BaseModel):
-    monthly_income: int
-    spending_habits: List[str]
-    preferred_benefits: List[str]
-    annual_fee_preference: Optional[str] = None
+# Text index and reward-rate matrix used for scoring (see scoring.py)
+scoring.load(cards_data)
+from scoring import ANNUAL_FEES, CARD_TEXT_MATRIX, MIN_MONTHLY_INCOMES, SPEND_CATEGORIES
+
+# Static parts of responses, serialized once per catalog version. Recommendation
+# payloads are assembled from these bytes plus the per-request fields.
+CATALOG_VERSION = hashlib.sha256(orjson.dumps(cards_data, option=orjson.OPT_SORT_KEYS)).hexdigest()[:16]
+CARD_FRAGMENTS = [
+    orjson.dumps({
+        "card_name": card.get('name', 'Unknown Card'),
+        "bank": card.get('issuer', 'Unknown Bank'),
+        "annual_fee": f"₹{card.get('annual_fee', 0)}",
+        "key_features": card.get('perks', [])[:3]
+    })[1:-1]
+    for card in cards_data
+]
+CARDS_BODY = orjson.dumps({"total_cards": len(cards_data), "cards": [card['name'] for card in cards_data]})
+CARDS_BODY_GZIP = gzip.compress(CARDS_BODY)
+CARDS_ETAG = f'"{CATALOG_VERSION}"'
+CARDS_ETAG_GZIP = f'"{CATALOG_VERSION}-gzip"'
+CARD_DOCUMENTS = [orjson.dumps(card) for card in cards_data]
+
+# Search indexes for /cards/search: values sorted with their card indices for
+# bisect on the "at most" range filters, per-card value arrays to check those
+# filters on a candidate set, and posting lists of card indices in catalog order
+# for the exact-match filters.
+def build_range_index(field: str) -> tuple:
+    order = sorted(range(len(cards_data)), key=lambda i: cards_data[i].get(field, 0))
+    return [cards_data[i].get(field, 0) for i in order], np.array(order, dtype=np.int64)
+
+def build_posting_index(keys_for) -> Dict[str, np.ndarray]:
+    postings = {}
+    for i, card in enumerate(cards_data):
+        for key in {key.lower() for key in keys_for(card)}:
+            postings.setdefault(key, []).append(i)
+    return {key: np.array(indices, dtype=np.int64) for key, indices in postings.items()}
+
+RANGE_FIELDS = ('annual_fee', 'joining_fee', 'min_monthly_income')
+RANGE_INDEXES = {field: build_range_index(field) for field in RANGE_FIELDS}
+RANGE_VALUES = {field: np.array([card.get(field, 0) for card in cards_data], dtype=np.float64) for field in RANGE_FIELDS}
+POSTING_INDEXES = {
+    'issuer': build_posting_index(lambda card: [card.get('issuer', '')]),
+    'reward_type': build_posting_index(lambda card: [card.get('reward_type', '')]),
+    'perk_tag': build_posting_index(lambda card: card['perk_tags'])
+}
+EMPTY_POSTINGS = np.array([], dtype=np.int64)
+
+# Sharded scoring: catalogs of at least SHARDED_SCORING_MIN_CARDS cards are scored
+# in a persistent process pool, off the event loop (match mode split into
+# SCORING_SHARDS contiguous shards). Small catalogs score in-process. The pool is
+# started and warmed at startup; its workers import only scoring.py and get the
+# scoring state from this process, not the catalog file or the search indexes.
+SCORING_SHARDS = int(os.environ.get('SCORING_SHARDS', os.cpu_count() or 1))
+SHARDED_SCORING_MIN_CARDS = int(os.environ.get('SHARDED_SCORING_MIN_CARDS', 50000))
+scoring_pool = None
+
+# Per-session score vectors, so each turn only applies what changed in the profile.
+# Each session holds one int32 vector per card (4 bytes x catalog size), so the
+# number of live sessions is capped by SCORING_SESSION_MEMORY_MB as well as by
+# MAX_SCORING_SESSIONS. Sessions idle for SCORING_SESSION_TTL seconds are dropped.
+MAX_SCORING_SESSIONS = int(os.environ.get('MAX_SCORING_SESSIONS', 10000))
+SCORING_SESSION_MEMORY_MB = int(os.environ.get('SCORING_SESSION_MEMORY_MB', 1024))
+SCORING_SESSION_TTL = float(os.environ.get('SCORING_SESSION_TTL', 1800))
+scoring_sessions = OrderedDict()
+
+CATEGORY_MEMBERSHIP = {
+    cat: np.array([cat in card['reward_rates'] for card in cards_data], dtype=bool)
+    for cat in SPEND_CATEGORIES if cat != 'default'
+}
+PERK_TAG_MEMBERSHIP = {
+    tag: np.array([tag in card['perk_tags'] for card in cards_data], dtype=bool)
+    for tag in sorted({tag for card in cards_data for tag in card['perk_tags']})
+}
+
 
 class CardRecommendation(BaseModel):
     card_name: str
@@ -37,141 +134,364 @@ class CardRecommendation(BaseModel):
     annual_fee: str
     key_features: List[str]
     justification: str
+    expected_annual_value: Optional[float] = None
 
 class RecommendationResponse(BaseModel):
     recommendations: List[CardRecommendation]
     total_cards_evaluated: int
 
-def calculate_match_score(card: Dict, user: UserInput) -> tuple:
-    score = 0
-    matched_categories = []
-    matched_benefits = []
-
-    if not isinstance(card, dict):
-        return 0, [], [], False
-
-    eligibility_text = card.get('eligibility', '').lower()
-    min_income = 0
-    if 'monthly income' in eligibility_text:
-        import re
-        numbers = re.findall(r'[\d,]+', eligibility_text)
-        if numbers:
-            min_income = int(numbers[0].replace(',', ''))
-    elif 'annual income' in eligibility_text:
-        import re
-        numbers = re.findall(r'[\d,]+', eligibility_text)
-        if numbers:
-            min_income = int(numbers[0].replace(',', '')) // 12
-
-    eligibility_met = user.monthly_income >= min_income
-    if eligibility_met:
-        score += 2
-
-    reward_rate = card.get('reward_rate', '').lower()
-    user_categories = [cat.lower() for cat in user.spending_habits]
-
-    category_mapping = {
-        'fuel': ['fuel', 'petrol', 'gas'],
-        'groceries': ['grocery', 'supermarket', 'food'],
-        'dining': ['dining', 'restaurant', 'food'],
-        'online': ['online', 'e-commerce'],
-        'offline': ['offline', 'retail'],
-        'travel': ['travel', 'flight', 'hotel']
-    }
-
-    for user_cat in user_categories:
-        mapped_cats = category_mapping.get(user_cat, [user_cat])
-        if any(cat in reward_rate for cat in mapped_cats):
-            score += 3
-            matched_categories.append(user_cat)
-
-    user_benefits = [ben.lower() for ben in user.preferred_benefits]
-    card_perks = [perk.lower() for perk in card.get('perks', [])]
-    reward_type = card.get('reward_type', '').lower()
-
-    benefit_mapping = {
-        'cashback': ['cashback', 'cash back'],
-        'rewards': ['reward', 'points'],
-        'lounge': ['lounge'],
-        'travel': ['travel', 'insurance'],
-        'fuel': ['fuel', 'surcharge']
-    }
-
-    for user_ben in user_benefits:
-        mapped_bens = benefit_mapping.get(user_ben, [user_ben])
-        if any(ben in reward_type for ben in mapped_bens) or any(ben in ' '.join(card_perks) for ben in mapped_bens):
-            score += 3
-            matched_benefits.append(user_ben)
+def encode_recommendations(indices: List[int], details: List[Dict]) -> bytes:
+    # same shape as RecommendationResponse, built from the pre-serialized card fragments
+    items = [b'{' + CARD_FRAGMENTS[i] + b',' + orjson.dumps(detail)[1:] for i, detail in zip(indices, details)]
+    return b'{"recommendations":[' + b','.join(items) + b'],"total_cards_evaluated":' + str(len(cards_data)).encode() + b'}'
+
+def validate_scoring_mode(user: UserInput):
+    if user.scoring_mode not in (None, "match", "value"):
+        raise HTTPException(status_code=400, detail=f"Unknown scoring_mode '{user.scoring_mode}'")
+    if user.scoring_mode == "value" and not user.monthly_spend:
+        raise HTTPException(status_code=400, detail="scoring_mode 'value' requires monthly_spend")
+
+def use_scoring_pool() -> bool:
+    return len(cards_data) >= SHARDED_SCORING_MIN_CARDS
+
+def get_scoring_pool() -> ProcessPoolExecutor:
+    global scoring_pool
+    if scoring_pool is None:
+        # spawn rather than fork: the server process already runs threads
+        context = multiprocessing.get_context('spawn')
+        scoring_pool = ProcessPoolExecutor(
+            max_workers=max(SCORING_SHARDS, 1),
+            mp_context=context,
+            initializer=scoring.init_worker,
+            initargs=(scoring.worker_state(), context.Barrier(max(SCORING_SHARDS, 1)))
+        )
+    return scoring_pool
+
+def shard_bounds(total: int, shards: int) -> List[tuple]:
+    size = -(-total // shards)
+    return [(start, min(start + size, total)) for start in range(0, total, size)]
+
+async def top_match_indices(user: UserInput, k: int = TOP_K, profile_target: Optional[tuple] = None) -> List[int]:
+    # each shard is profiled in the worker that scores it
+    loop = asyncio.get_running_loop()
+    pool = get_scoring_pool()
+    shard_results = await asyncio.gather(*[
+        loop.run_in_executor(
+            pool, run_profiled,
+            profile_target and (f"{profile_target[0]}_shard{shard}", profile_target[1]),
+            score_shard, start, end, user, k
+        )
+        for shard, (start, end) in enumerate(shard_bounds(len(cards_data), max(SCORING_SHARDS, 1)))
+    ])
+    merged = heapq.merge(*shard_results, reverse=True)
+    return [-neg_index for _, neg_index in islice(merged, k)]
+
+def max_scoring_sessions() -> int:
+    per_session = 4 * max(len(cards_data), 1)
+    return max(1, min(MAX_SCORING_SESSIONS, SCORING_SESSION_MEMORY_MB * 2 ** 20 // per_session))
+
+def top_k_indices(scores: np.ndarray, k: int) -> List[int]:
+    # O(n) selection; ties at the cut-off keep catalog order, as the stable sort did
+    if len(scores) > k:
+        threshold = scores[np.argpartition(-scores, k - 1)[k - 1]]
+        above = np.flatnonzero(scores > threshold)
+        ties = np.flatnonzero(scores == threshold)[:k - len(above)]
+        candidates = np.concatenate([above, ties])
+    else:
+        candidates = np.arange(len(scores))
+    return candidates[np.lexsort((candidates, -scores[candidates]))].tolist()
+
+# Contribution of each profile field to the per-card match score, as int32 vectors.
+def eligibility_vector(monthly_income: Optional[int]) -> np.ndarray:
+    if monthly_income is None:
+        return np.zeros(len(cards_data), dtype=np.int32)
+    return (monthly_income >= MIN_MONTHLY_INCOMES) * np.int32(2)
+
+def category_vector(category: str) -> np.ndarray:
+    membership = CATEGORY_MEMBERSHIP.get(category, np.zeros(len(cards_data), dtype=bool))
+    return membership * np.int32(3)
+
+def benefit_vector(benefit: str) -> np.ndarray:
+    similarity = (CARD_TEXT_MATRIX @ text_vectors([benefit]).T).toarray().ravel()
+    tagged = PERK_TAG_MEMBERSHIP.get(benefit, np.zeros(len(cards_data), dtype=bool))
+    return (tagged | (similarity >= BENEFIT_MATCH_THRESHOLD)) * np.int32(3)
+
+def fee_vector(fee_preference: str) -> np.ndarray:
+    if fee_preference == "no fee":
+        return (ANNUAL_FEES == 0) * np.int32(2)
+    if fee_preference == "low fee":
+        return (ANNUAL_FEES <= 1000) * np.int32(1)
+    return np.zeros(len(cards_data), dtype=np.int32)
+
+def context_vector(context: str) -> np.ndarray:
+    if not context:
+        return np.zeros(len(cards_data), dtype=np.int32)
+    similarity = (CARD_TEXT_MATRIX @ text_vectors([context]).T).toarray().ravel()
+    return np.rint(CONTEXT_WEIGHT * similarity).astype(np.int32)
+
+# Per-card match scores for one conversation, kept equal to calculate_match_score.
+# Only the summed score vector is stored; when a field changes, its old and new
+# contributions are recomputed from the stored field values and applied as a delta.
+class ScoringSession:
+    def __init__(self):
+        self.scores = np.zeros(len(cards_data), dtype=np.int32)
+        self.monthly_income = None
+        self.categories = Counter()
+        self.benefits = Counter()
+        self.annual_fee_preference = ''
+        self.additional_context = ''
+        self.last_used = time.monotonic()
+        self.lock = threading.Lock()
+
+    def apply_counts(self, current: Counter, new: Counter, vector_for):
+        for name in set(current) | set(new):
+            delta = new[name] - current[name]
+            if delta:
+                self.scores += delta * vector_for(name)
+        current.clear()
+        current.update(new)
+
+    def apply(self, user: UserInput) -> np.ndarray:
+        if user.monthly_income != self.monthly_income:
+            self.scores += eligibility_vector(user.monthly_income) - eligibility_vector(self.monthly_income)
+            self.monthly_income = user.monthly_income
+
+        self.apply_counts(self.categories, Counter(cat.lower() for cat in user.spending_habits if cat.lower() != 'default'), category_vector)
+        self.apply_counts(self.benefits, Counter(ben.lower() for ben in user.preferred_benefits), benefit_vector)
+
+        fee_preference = (user.annual_fee_preference or '').lower()
+        if fee_preference != self.annual_fee_preference:
+            self.scores += fee_vector(fee_preference) - fee_vector(self.annual_fee_preference)
+            self.annual_fee_preference = fee_preference
+
+        context = user.additional_context or ''
+        if context != self.additional_context:
+            self.scores += context_vector(context) - context_vector(self.additional_context)
+            self.additional_context = context
+
+        return self.scores
+
+    def top_k(self, user: UserInput, k: int = TOP_K) -> List[int]:
+        # runs in a worker thread; the lock serialises overlapping turns of one session
+        with self.lock:
+            return top_k_indices(self.apply(user), k)
+
+def get_scoring_session(session_id: str) -> ScoringSession:
+    now = time.monotonic()
+    while scoring_sessions:
+        oldest = next(iter(scoring_sessions.values()))
+        if now - oldest.last_used <= SCORING_SESSION_TTL:
+            break
+        scoring_sessions.popitem(last=False)
+
+    session = scoring_sessions.get(session_id)
+    if session is None:
+        session = ScoringSession()
+        scoring_sessions[session_id] = session
+        while len(scoring_sessions) > max_scoring_sessions():
+            scoring_sessions.popitem(last=False)
+    else:
+        scoring_sessions.move_to_end(session_id)
+    session.last_used = now
+    return session
+
+def match_response(user: UserInput, indices: List[int]) -> bytes:
+    text_scores = match_text(user, indices)
+    details = [recommendation_details(cards_data[i], user, text_scores=text_scores[row]) for row, i in enumerate(indices)]
+    return encode_recommendations(indices, details)
+
+def session_match_response(session: ScoringSession, user: UserInput) -> bytes:
+    return match_response(user, session.top_k(user))
+
+def full_match_response(user: UserInput) -> bytes:
+    return match_response(user, [-neg_index for _, neg_index in score_shard(0, len(cards_data), user, TOP_K)])
+
+async def recommend_by_match(user: UserInput, route: Optional[str] = None) -> bytes:
+    # each profiled call covers scoring, details and encoding of the response
+    profile_target = route and (route, user.session_id)
+    if user.session_id:
+        session = get_scoring_session(user.session_id)
+        return await asyncio.to_thread(run_profiled, profile_target, session_match_response, session, user)
+    if not use_scoring_pool():
+        return run_profiled(profile_target, full_match_response, user)
+    indices = await top_match_indices(user, profile_target=profile_target)
+    return run_profiled(profile_target, match_response, user, indices)
+
+def encode_value_results(results: List[tuple]) -> List[bytes]:
+    return [encode_recommendations(indices, details) for indices, details in results]
+
+def recommend_by_value(users: List[UserInput]) -> List[bytes]:
+    return encode_value_results(value_details(users))
+
+async def recommend_by_value_async(users: List[UserInput], route: Optional[str] = None) -> List[bytes]:
+    # the cards x categories product, ranking and details run in the pool for large catalogs
+    profile_target = route and (route, users[0].session_id if len(users) == 1 else None)
+    if not use_scoring_pool():
+        return run_profiled(profile_target, recommend_by_value, users)
+    results = await asyncio.get_running_loop().run_in_executor(
+        get_scoring_pool(), run_profiled, profile_target, value_details, users, TOP_K
+    )
+    return run_profiled(profile_target, encode_value_results, results)
 
-    if user.annual_fee_preference:
-        annual_fee = card.get('annual_fee', 0)
-        if user.annual_fee_preference.lower() == "no fee" and annual_fee == 0:
-            score += 2
-        elif user.annual_fee_preference.lower() == "low fee" and annual_fee <= 1000:
-            score += 1
+@app.post("/recommendations", response_model=RecommendationResponse)
+async def get_recommendations(user_input: UserInput, request: Request):
+    validate_scoring_mode(user_input)
+    route = profile_route(request)
+    try:
+        if user_input.scoring_mode == "value":
+            body = (await recommend_by_value_async([user_input], route))[0]
+        else:
+            body = await recommend_by_match(user_input, route)
+        return Response(content=body, media_type="application/json")
 
-    return score, matched_categories, matched_benefits, eligibility_met
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/recommendations", response_model=RecommendationResponse)
-async def get_recommendations(user_input: UserInput):
+@app.post("/recommendations/batch", response_model=List[RecommendationResponse])
+async def get_batch_recommendations(user_inputs: List[UserInput], request: Request):
+    for user_input in user_inputs:
+        validate_scoring_mode(user_input)
+    route = profile_route(request)
     try:
-        recommendations = []
-
-        for card in cards_data:
-            score, matched_cats, matched_bens, eligible = calculate_match_score(card, user_input)
-
-            justification = f"Score: {score}/10. "
-            if eligible:
-                justification += "Income requirement met. "
-            else:
-                justification += "Income requirement not met. "
-
-            if matched_cats:
-                justification += f"Matches spending: {', '.join(matched_cats)}. "
-            if matched_bens:
-                justification += f"Matches benefits: {', '.join(matched_bens)}. "
-
-            recommendations.append(CardRecommendation(
-                card_name=card.get('name', 'Unknown Card'),
-                bank=card.get('issuer', 'Unknown Bank'),
-                match_score=score,
-                eligibility_met=eligible,
-                matched_categories=matched_cats,
-                matched_benefits=matched_bens,
-                annual_fee=f"₹{card.get('annual_fee', 0)}",
-                key_features=card.get('perks', [])[:3],
-                justification=justification
-            ))
-
-        recommendations.sort(key=lambda x: x.match_score, reverse=True)
-        top_recommendations = recommendations[:5]
-
-        return RecommendationResponse(
-            recommendations=top_recommendations,
-            total_cards_evaluated=len(cards_data)
-        )
+        # value-mode users are ranked together with a single matrix product
+        value_rows = [i for i, u in enumerate(user_inputs) if u.scoring_mode == "value"]
+        results = [None] * len(user_inputs)
+        if value_rows:
+            for i, body in zip(value_rows, await recommend_by_value_async([user_inputs[i] for i in value_rows], route)):
+                results[i] = body
+        for i, user_input in enumerate(user_inputs):
+            if results[i] is None:
+                results[i] = await recommend_by_match(user_input, route)
+        return Response(content=b'[' + b','.join(results) + b']', media_type="application/json")
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def search_card_indices(range_filters: Dict[str, int], posting_filters: List[tuple], offset: int, limit: int) -> tuple:
+    # returns (total matches, card indices of the requested page), in catalog order;
+    # the shortest posting list drives, else the most selective range filter
+    if not range_filters and not posting_filters:
+        return len(cards_data), list(range(min(offset, len(cards_data)), min(offset + limit, len(cards_data))))
+
+    postings = sorted(
+        (POSTING_INDEXES[index_name].get(key.lower(), EMPTY_POSTINGS) for index_name, key in posting_filters),
+        key=len
+    )
+    range_counts = {
+        field: bisect.bisect_right(RANGE_INDEXES[field][0], max_value)
+        for field, max_value in range_filters.items()
+    }
+
+    if postings:
+        candidates = postings[0]
+        postings = postings[1:]
+    else:
+        field = min(range_counts, key=range_counts.get)
+        end = range_counts[field]
+        if end * 8 < len(cards_data):
+            candidates = np.sort(RANGE_INDEXES[field][1][:end])
+        else:
+            candidates = np.flatnonzero(RANGE_VALUES[field] <= range_filters[field])
+
+    # the other filters are combined into one mask over the driving candidates,
+    # which already are in catalog order
+    keep = np.ones(len(candidates), dtype=bool)
+    for other in postings:
+        if len(candidates) <= 1024:
+            positions = np.minimum(np.searchsorted(other, candidates), max(len(other) - 1, 0))
+            keep &= other[positions] == candidates if len(other) else False
+        else:
+            member = np.zeros(len(cards_data), dtype=bool)
+            member[other] = True
+            keep &= member[candidates]
+    for field, max_value in range_filters.items():
+        keep &= RANGE_VALUES[field][candidates] <= max_value
+
+    hits = np.flatnonzero(keep)
+    return len(hits), candidates[hits[offset:offset + limit]].tolist()
+
+# Opt-in profiling (see profiling.py): the endpoints decide per request whether
+# it is sampled and pass the route down to the scoring calls.
+def profile_route(request: Request) -> Optional[str]:
+    # the route to tag profiles with, or None when this request is not sampled
+    return request.url.path if PROFILING and should_profile(request.headers) else None
+
+@app.on_event("startup")
+async def start_scoring_pool():
+    # start every worker before serving, so no request waits for process start-up
+    if not use_scoring_pool():
+        return
+    loop = asyncio.get_running_loop()
+    pool = get_scoring_pool()
+    await asyncio.gather(*[loop.run_in_executor(pool, scoring.worker_ready) for _ in range(max(SCORING_SHARDS, 1))])
+
+@app.on_event("shutdown")
+def shutdown_scoring_pool():
+    if scoring_pool is not None:
+        scoring_pool.shutdown(cancel_futures=True)
+
 @app.get("/")
 async def root():
     return {"message": "Credit Card Recommendation API", "status": "active"}
 
 @app.get("/cards")
-async def get_all_cards():
-    return {"total_cards": len(cards_data), "cards": [card['name'] for card in cards_data]}
+async def get_all_cards(request: Request):
+    use_gzip = 'gzip' in request.headers.get('accept-encoding', '').lower()
+    etag = CARDS_ETAG_GZIP if use_gzip else CARDS_ETAG
+    headers = {"ETag": etag, "Vary": "Accept-Encoding", "Cache-Control": "no-cache"}
+
+    if_none_match = request.headers.get('if-none-match', '')
+    candidates = {tag.strip().removeprefix('W/') for tag in if_none_match.split(',')}
+    if '*' in candidates or CARDS_ETAG in candidates or CARDS_ETAG_GZIP in candidates:
+        return Response(status_code=304, headers=headers)
+
+    if use_gzip:
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=CARDS_BODY_GZIP, media_type="application/json", headers=headers)
+    return Response(content=CARDS_BODY, media_type="application/json", headers=headers)
+
+@app.get("/cards/search")
+async def search_cards(
+    issuer: Optional[str] = None,
+    reward_type: Optional[str] = None,
+    perk: List[str] = Query(default=[]),
+    max_annual_fee: Optional[int] = None,
+    max_joining_fee: Optional[int] = None,
+    monthly_income: Optional[int] = None,
+    offset: int = Query(default=0, ge=0),
+    limit: int = Query(default=20, ge=1, le=100)
+):
+    range_filters = {}
+    if max_annual_fee is not None:
+        range_filters['annual_fee'] = max_annual_fee
+    if max_joining_fee is not None:
+        range_filters['joining_fee'] = max_joining_fee
+    if monthly_income is not None:
+        range_filters['min_monthly_income'] = monthly_income
+
+    posting_filters = [('perk_tag', tag) for tag in perk]
+    if issuer:
+        posting_filters.append(('issuer', issuer))
+    if reward_type:
+        posting_filters.append(('reward_type', reward_type))
+
+    total, page = search_card_indices(range_filters, posting_filters, offset, limit)
+    body = (
+        b'{"total":' + str(total).encode() +
+        b',"offset":' + str(offset).encode() +
+        b',"limit":' + str(limit).encode() +
+        b',"cards":[' + b','.join(CARD_DOCUMENTS[i] for i in page) + b']}'
+    )
+    return Response(content=body, media_type="application/json")
 
 if __name__ == "__main__":
+    import uvicorn
     import nest_asyncio
     nest_asyncio.apply()
 
     config = uvicorn.Config(app, host="0.0.0.0", port=8002, log_level="info")
     server = uvicorn.Server(config)
 
-    import asyncio
-    import threading
-
     def start_server():
         loop = asyncio.new_event_loop()
         asyncio.set_event_loop(loop)
@@ -180,6 +500,5 @@ if __name__ == "__main__":
     server_thread = threading.Thread(target=start_server, daemon=True)
     server_thread.start()
 
-    import time
     time.sleep(2)
     print("Server is running on http://localhost:8002")
\ No newline at end of file
@@ -0,0 +1,54 @@
+import cProfile
+import os
+import random
+import re
+import threading
+import time
+from typing import Optional
+
+# Opt-in profiling of the scoring call, shared by the API process and the scoring
+# pool workers. Unless PROFILING is set nothing is profiled and no request is
+# sampled. For a sampled request (PROFILE_SAMPLE_RATE, or the PROFILE_HEADER
+# header set) the endpoint passes a profile target down to run_profiled, which
+# wraps the request's scoring, details and encoding in the thread or pool process
+# that runs them. Other coroutines on the event loop stay out of the profile.
+# Pooled requests write one file per worker call (per shard in match mode) plus
+# one for the merge and encoding in the API process. Files are pstats dumps in
+# PROFILE_DIR; only the newest PROFILE_MAX_FILES (at least 1) are kept.
+PROFILING = os.environ.get('PROFILING', '').lower() in ('1', 'true', 'yes')
+PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', 0.01))
+PROFILE_HEADER = os.environ.get('PROFILE_HEADER', 'X-Profile')
+PROFILE_DIR = os.environ.get('PROFILE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'profiles'))
+PROFILE_MAX_FILES = max(int(os.environ.get('PROFILE_MAX_FILES', 100)), 1)
+# cProfile allows one active profiler at a time; overlapping calls in one process go unprofiled
+profile_lock = threading.Lock()
+
+def should_profile(headers) -> bool:
+    return headers.get(PROFILE_HEADER, '').lower() in ('1', 'true', 'yes') or random.random() < PROFILE_SAMPLE_RATE
+
+def save_profile(profiler: cProfile.Profile, route: str, session_id: Optional[str]):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    tag = re.sub(r'[^A-Za-z0-9_-]+', '-', f"{route}_{session_id or 'nosession'}").strip('-')
+    profiler.dump_stats(os.path.join(PROFILE_DIR, f"{time.time_ns()}_{tag}.prof"))
+
+    profiles = sorted(name for name in os.listdir(PROFILE_DIR) if name.endswith('.prof'))
+    for name in profiles[:max(len(profiles) - PROFILE_MAX_FILES, 0)]:
+        try:
+            os.remove(os.path.join(PROFILE_DIR, name))
+        except FileNotFoundError:
+            pass
+
+def run_profiled(target: Optional[tuple], func, *args):
+    # target is (route, session_id), or None to just call func
+    if target is None or not profile_lock.acquire(blocking=False):
+        return func(*args)
+    try:
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            return func(*args)
+        finally:
+            profiler.disable()
+            save_profile(profiler, *target)
+    finally:
+        profile_lock.release()
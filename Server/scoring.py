@@ -0,0 +1,255 @@
+import heapq
+import os
+import re
+from typing import Dict, List, Optional
+
+import numpy as np
+from pydantic import BaseModel, confloat
+from scipy import sparse
+
+# Scoring core shared by the API (main.py), bulk scoring and the scoring pool.
+# The API process builds the scoring state from the catalog with load(). Pool
+# workers import only this module and receive that state through init_worker, so
+# a worker never re-reads the catalog file or builds the search indexes and
+# response fragments that only the API process serves from.
+
+TOP_K = 5
+
+# Per-category monthly spend in rupees; the cap keeps expected values finite.
+MAX_MONTHLY_SPEND = 1e12
+
+class UserInput(BaseModel):
+    monthly_income: int
+    spending_habits: List[str]
+    preferred_benefits: List[str]
+    annual_fee_preference: Optional[str] = None
+    monthly_spend: Optional[Dict[str, confloat(ge=0, le=MAX_MONTHLY_SPEND, allow_inf_nan=False)]] = None
+    scoring_mode: Optional[str] = "match"
+    session_id: Optional[str] = None
+    additional_context: Optional[str] = ""
+
+# Sparse TF-IDF index over each card's perks, reward_type and reward_rate text.
+# User benefits and additional_context are matched against it with one sparse
+# product per request instead of substring scans.
+TEXT_STOPWORDS = {'a', 'an', 'and', 'for', 'in', 'of', 'on', 'per', 'the', 'to', 'with', 'all', 'x'}
+BENEFIT_MATCH_THRESHOLD = 0.2
+CONTEXT_WEIGHT = 3
+
+# Card fields calculate_match_score reads; pool workers get only these per card.
+SCORING_FIELDS = ('min_monthly_income', 'reward_rates', 'perk_tags', 'annual_fee')
+
+# Scoring state, set by load() in the API process and by init_worker() in pool workers.
+cards_data = []
+TEXT_VOCABULARY = {}
+TEXT_IDF = np.zeros(0)
+CARD_TEXT_MATRIX = sparse.csr_matrix((0, 0))
+SPEND_CATEGORIES = ['default']
+CATEGORY_INDEX = {'default': 0}
+REWARD_RATE_MATRIX = np.zeros((1, 0))
+ANNUAL_FEES = np.zeros(0)
+MIN_MONTHLY_INCOMES = np.zeros(0)
+startup_barrier = None
+
+def tokenize(text: str) -> List[str]:
+    tokens = []
+    for word in re.findall(r'[a-z]+', text.lower()):
+        if word in TEXT_STOPWORDS:
+            continue
+        if len(word) > 6 and word.endswith('ies'):
+            word = word[:-3] + 'y'
+        elif len(word) > 3 and word.endswith('s') and not word.endswith('ss'):
+            word = word[:-1]
+        tokens.append(word)
+    return tokens
+
+def card_text(card: Dict) -> str:
+    return ' '.join(card.get('perks', []) + [card.get('reward_type', ''), card.get('reward_rate', '')])
+
+def build_text_index(cards: List[Dict]) -> tuple:
+    docs = [tokenize(card_text(card)) for card in cards]
+    vocabulary = {}
+    for doc in docs:
+        for token in doc:
+            vocabulary.setdefault(token, len(vocabulary))
+
+    rows, cols, counts = [], [], []
+    for row, doc in enumerate(docs):
+        for token in doc:
+            rows.append(row)
+            cols.append(vocabulary[token])
+            counts.append(1.0)
+    # duplicate (row, col) entries are summed into term counts
+    tf = sparse.csr_matrix((counts, (rows, cols)), shape=(len(docs), len(vocabulary)))
+
+    df = np.bincount(tf.indices, minlength=len(vocabulary))
+    idf = np.log((1 + len(docs)) / (1 + df)) + 1
+    return vocabulary, idf, normalize_rows(tf @ sparse.diags(idf))
+
+def normalize_rows(matrix: sparse.csr_matrix) -> sparse.csr_matrix:
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return sparse.csr_matrix(sparse.diags(1 / norms) @ matrix)
+
+def text_vectors(texts: List[str]) -> sparse.csr_matrix:
+    rows, cols, counts = [], [], []
+    for row, text in enumerate(texts):
+        for token in tokenize(text):
+            if token in TEXT_VOCABULARY:
+                rows.append(row)
+                cols.append(TEXT_VOCABULARY[token])
+                counts.append(1.0)
+    tf = sparse.csr_matrix((counts, (rows, cols)), shape=(len(texts), len(TEXT_VOCABULARY)))
+    return normalize_rows(tf @ sparse.diags(TEXT_IDF))
+
+def load(cards: List[Dict]):
+    global cards_data, TEXT_VOCABULARY, TEXT_IDF, CARD_TEXT_MATRIX
+    global SPEND_CATEGORIES, CATEGORY_INDEX, REWARD_RATE_MATRIX, ANNUAL_FEES, MIN_MONTHLY_INCOMES
+    cards_data = cards
+    TEXT_VOCABULARY, TEXT_IDF, CARD_TEXT_MATRIX = build_text_index(cards)
+
+    # Reward-rate matrix for the expected-annual-value engine: one row per spend
+    # category (plus "default" for spends that earn the base rate), one column per
+    # card, values as the fraction of spend returned.
+    SPEND_CATEGORIES = sorted({cat for card in cards for cat in card['reward_rates'] if cat != 'default'}) + ['default']
+    CATEGORY_INDEX = {cat: i for i, cat in enumerate(SPEND_CATEGORIES)}
+    REWARD_RATE_MATRIX = np.array([
+        [card['reward_rates'].get(cat, card['reward_rates'].get('default', 0.0)) / 100 for card in cards]
+        for cat in SPEND_CATEGORIES
+    ], dtype=np.float64).reshape(len(SPEND_CATEGORIES), len(cards))
+    ANNUAL_FEES = np.array([card.get('annual_fee', 0) for card in cards], dtype=np.float64)
+    MIN_MONTHLY_INCOMES = np.array([card['min_monthly_income'] for card in cards], dtype=np.float64)
+
+def worker_state() -> Dict:
+    return {
+        'cards_data': [{field: card[field] for field in SCORING_FIELDS if field in card} for card in cards_data],
+        'TEXT_VOCABULARY': TEXT_VOCABULARY,
+        'TEXT_IDF': TEXT_IDF,
+        'CARD_TEXT_MATRIX': CARD_TEXT_MATRIX,
+        'SPEND_CATEGORIES': SPEND_CATEGORIES,
+        'CATEGORY_INDEX': CATEGORY_INDEX,
+        'REWARD_RATE_MATRIX': REWARD_RATE_MATRIX,
+        'ANNUAL_FEES': ANNUAL_FEES,
+        'MIN_MONTHLY_INCOMES': MIN_MONTHLY_INCOMES
+    }
+
+def init_worker(state: Dict, barrier=None):
+    global startup_barrier
+    globals().update(state)
+    startup_barrier = barrier
+
+def worker_ready() -> int:
+    # submitted once per worker at startup; waiting on the barrier keeps a worker
+    # from taking a second call, so every process is running before this returns
+    if startup_barrier is not None:
+        startup_barrier.wait()
+    return os.getpid()
+
+def match_text(user: UserInput, rows=None) -> np.ndarray:
+    # (cards x vocab) @ (vocab x queries): one column per preferred benefit, last column for additional_context
+    queries = text_vectors(list(user.preferred_benefits) + [user.additional_context or ''])
+    matrix = CARD_TEXT_MATRIX if rows is None else CARD_TEXT_MATRIX[rows]
+    return (matrix @ queries.T).toarray()
+
+def calculate_match_score(card: Dict, user: UserInput, text_scores: Optional[np.ndarray] = None) -> tuple:
+    score = 0
+    matched_categories = []
+    matched_benefits = []
+
+    if not isinstance(card, dict):
+        return 0, [], [], False
+
+    eligibility_met = user.monthly_income >= card['min_monthly_income']
+    if eligibility_met:
+        score += 2
+
+    reward_rates = card['reward_rates']
+    for user_cat in [cat.lower() for cat in user.spending_habits]:
+        if user_cat != 'default' and user_cat in reward_rates:
+            score += 3
+            matched_categories.append(user_cat)
+
+    perk_tags = card['perk_tags']
+    for j, user_ben in enumerate([ben.lower() for ben in user.preferred_benefits]):
+        if user_ben in perk_tags or (text_scores is not None and text_scores[j] >= BENEFIT_MATCH_THRESHOLD):
+            score += 3
+            matched_benefits.append(user_ben)
+
+    if user.additional_context and text_scores is not None:
+        score += int(round(CONTEXT_WEIGHT * text_scores[-1]))
+
+    if user.annual_fee_preference:
+        annual_fee = card.get('annual_fee', 0)
+        if user.annual_fee_preference.lower() == "no fee" and annual_fee == 0:
+            score += 2
+        elif user.annual_fee_preference.lower() == "low fee" and annual_fee <= 1000:
+            score += 1
+
+    return score, matched_categories, matched_benefits, eligibility_met
+
+def spend_matrix(users: List[UserInput]) -> np.ndarray:
+    spend = np.zeros((len(users), len(SPEND_CATEGORIES)), dtype=np.float64)
+    for row, user in enumerate(users):
+        for category, amount in (user.monthly_spend or {}).items():
+            col = CATEGORY_INDEX.get(category.lower(), CATEGORY_INDEX['default'])
+            spend[row, col] += amount
+    return spend
+
+def expected_annual_values(spend: np.ndarray) -> np.ndarray:
+    # (users x categories) @ (categories x cards) -> yearly rewards per user and card, net of fee
+    return 12 * (spend @ REWARD_RATE_MATRIX) - ANNUAL_FEES
+
+def rank_by_value(users: List[UserInput], k: int = TOP_K) -> tuple:
+    values = expected_annual_values(spend_matrix(users))
+    incomes = np.array([user.monthly_income for user in users], dtype=np.float64)
+    eligible = incomes[:, None] >= MIN_MONTHLY_INCOMES[None, :]
+
+    rankings = []
+    for row in range(len(users)):
+        # eligible cards first, then by expected value
+        order = np.lexsort((-values[row], ~eligible[row]))[:k]
+        rankings.append(order.tolist())
+    return rankings, values
+
+def recommendation_details(card: Dict, user: UserInput, expected_value: Optional[float] = None, text_scores: Optional[np.ndarray] = None) -> Dict:
+    score, matched_cats, matched_bens, eligible = calculate_match_score(card, user, text_scores)
+
+    justification = f"Score: {score}/10. "
+    if eligible:
+        justification += "Income requirement met. "
+    else:
+        justification += "Income requirement not met. "
+
+    if matched_cats:
+        justification += f"Matches spending: {', '.join(matched_cats)}. "
+    if matched_bens:
+        justification += f"Matches benefits: {', '.join(matched_bens)}. "
+    if expected_value is not None:
+        justification += f"Expected annual value after fees: ₹{expected_value:,.0f}. "
+
+    return {
+        "match_score": score,
+        "eligibility_met": eligible,
+        "matched_categories": matched_cats,
+        "matched_benefits": matched_bens,
+        "justification": justification,
+        "expected_annual_value": None if expected_value is None else round(expected_value, 2)
+    }
+
+def score_shard(start: int, end: int, user: UserInput, k: int) -> List[tuple]:
+    # local top-k as (score, -index) so ties keep catalog order, sorted best first
+    text_scores = match_text(user, slice(start, end))
+    scored = (
+        (calculate_match_score(cards_data[i], user, text_scores[i - start])[0], -i)
+        for i in range(start, end)
+    )
+    return heapq.nlargest(k, scored)
+
+def value_details(users: List[UserInput], k: int = TOP_K) -> List[tuple]:
+    # (card indices, recommendation details) per user, ranked by expected annual value
+    rankings, values = rank_by_value(users, k)
+    results = []
+    for row, user in enumerate(users):
+        text_scores = match_text(user, rankings[row])
+        details = [recommendation_details(cards_data[i], user, float(values[row, i]), text_scores[j]) for j, i in enumerate(rankings[row])]
+        results.append((rankings[row], details))
+    return results
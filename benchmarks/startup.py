@@ -0,0 +1,107 @@
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# How to import, launch and probe each service. {port} is filled in per run.
+SERVICES = {
+    "backend": {
+        "cwd": os.path.join(ROOT, "Backend"),
+        "module": "app",
+        "command": ["app.py"],
+        "env": {"PORT": "{port}"},
+        "probe": "/test"
+    },
+    "server": {
+        "cwd": os.path.join(ROOT, "Server"),
+        "module": "main",
+        "command": ["-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", "{port}", "--log-level", "warning"],
+        "env": {},
+        "probe": "/cards"
+    }
+}
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def measure_import(python: str, service: dict) -> float:
+    code = (
+        "import time; started = time.perf_counter(); "
+        f"import {service['module']}; "
+        "print(time.perf_counter() - started)"
+    )
+    result = subprocess.run(
+        [python, "-c", code], cwd=service["cwd"], capture_output=True, text=True, check=True
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+def measure_first_request(python: str, service: dict, timeout: float) -> float:
+    port = free_port()
+    env = dict(os.environ, **{key: value.format(port=port) for key, value in service["env"].items()})
+    command = [python] + [part.format(port=port) for part in service["command"]]
+    url = f"http://127.0.0.1:{port}{service['probe']}"
+
+    started = time.perf_counter()
+    process = subprocess.Popen(command, cwd=service["cwd"], env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while time.perf_counter() - started < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f"{' '.join(command)} exited with code {process.returncode}")
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except (urllib.error.URLError, ConnectionError, OSError):
+                time.sleep(0.02)
+        raise TimeoutError(f"{url} did not answer within {timeout}s")
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure import time and time-to-first-successful-request for the Backend and Server.")
+    parser.add_argument('services', nargs='*', help=f"services to benchmark: {', '.join(sorted(SERVICES))} (default: all)")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--python', default=sys.executable, help="interpreter to benchmark with")
+    parser.add_argument('--timeout', type=float, default=60.0, help="seconds to wait for the first successful request")
+    parser.add_argument('--max-import-seconds', type=float, help="fail if the median import time exceeds this")
+    parser.add_argument('--max-ready-seconds', type=float, help="fail if the median time to first request exceeds this")
+    args = parser.parse_args()
+    unknown = sorted(set(args.services) - set(SERVICES))
+    if unknown:
+        parser.error(f"unknown services: {', '.join(unknown)}")
+
+    failed = False
+    for name in args.services or sorted(SERVICES):
+        service = SERVICES[name]
+        imports = [measure_import(args.python, service) for _ in range(args.runs)]
+        ready = [measure_first_request(args.python, service, args.timeout) for _ in range(args.runs)]
+
+        import_median = statistics.median(imports)
+        ready_median = statistics.median(ready)
+        print(f"{name}: import median {import_median:.3f}s (min {min(imports):.3f}s), "
+              f"first request median {ready_median:.3f}s (min {min(ready):.3f}s) over {args.runs} runs")
+
+        if args.max_import_seconds is not None and import_median > args.max_import_seconds:
+            print(f"{name}: import time {import_median:.3f}s exceeds {args.max_import_seconds}s", file=sys.stderr)
+            failed = True
+        if args.max_ready_seconds is not None and ready_median > args.max_ready_seconds:
+            print(f"{name}: time to first request {ready_median:.3f}s exceeds {args.max_ready_seconds}s", file=sys.stderr)
+            failed = True
+
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()